@@ -1,6 +1,11 @@
 # !pip install smolagents[litellm]
-from smolagents import CodeAgent, LiteLLMModel, OpenAIServerModel, tool, WebSearchTool, FinalAnswerTool, PythonInterpreterTool, \
+import asyncio
+import threading
+
+import numpy as np
+from smolagents import LiteLLMModel, tool, WebSearchTool, FinalAnswerTool, PythonInterpreterTool, \
     UserInputTool
+from src.agent_factory import get_agent
 from src.tools.clean_system import clean_system
 from src.tools.get_system_info import get_system_info
 from src.tools.open_app import open_app
@@ -8,7 +13,7 @@ from src.tools.organize_folder import organize_folder
 from src.tools.write_file import write_file
 from typing import Any
 from smolagents import Tool
-from fastrtc import Stream, ReplyOnPause, get_stt_model, get_tts_model
+from fastrtc import AlgoOptions, SileroVadOptions, Stream, ReplyOnPause, get_stt_model, get_tts_model
 
 from typing import Any
 from smolagents import Tool
@@ -16,14 +21,9 @@ from smolagents import Tool
 from smolagents import tool
 
 
-model = OpenAIServerModel(
-    model_id="deepseek-r1-0528-qwen3-8b",                # matches the model name in LM Studio
-    api_base="http://localhost:1234/v1",  # LM Studio’s endpoint
-    api_key="none"
-)
-
-agent = CodeAgent(tools=[
-    ], max_steps=3, model=model, add_base_tools=True, additional_authorized_imports=['open','thefuzz','subprocess'] )
+agent = get_agent(tools=[
+    ], max_steps=3, add_base_tools=True, additional_authorized_imports=['open','rapidfuzz','subprocess'],
+    stream_outputs=True)
 
 
 stt_model = get_stt_model()   # e.g. a tiny Whisper model
@@ -32,33 +32,91 @@ tts_model = get_tts_model()   # e.g. Orpheus-400M or Bark
 # Optionally keep a transcript history if you want context in your prompts:
 conversation = []
 
-def handle_audio(audio_chunk):
+# Strong references to in-flight tasks so they are not garbage-collected mid-run
+_background_tasks = set()
+_DONE = object()
+
+
+def _track(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _produce(iterable, queue, loop, stop):
+    """Push every item of *iterable* onto *queue* from a worker thread until *stop* is set."""
+    try:
+        for item in iterable:
+            if stop.is_set():
+                break
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+    finally:
+        loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+
+async def handle_audio(audio_chunk):
     # 2) Convert speech bytes → text
-    text = stt_model.stt(audio_chunk)
+    text = await asyncio.to_thread(stt_model.stt, audio_chunk)
     if not text.strip():
         return  # sometimes VAD fires on noise
 
     print(f"[ASR] {text}")
     conversation.append({"role": "user", "content": text })
 
-    # 3) Run your SmolAgent
-    response = agent.run(text + "\n\n /no_think", reset=False)
-    agent.stream_outputs = True
+    # 3) Run your SmolAgent off the event loop
+    response = await _track(asyncio.to_thread(agent.run, text + "\n\n /no_think", reset=False))
 
     conversation.append({"role": "assistant", "content": response})
     print(f"[Agent] {response}")
 
-    # 4) Convert text → PCM chunks and stream back
-    for pcm in tts_model.stream_tts_sync(response):
-        yield pcm
+    # 4) Synthesize in a worker so the next sentence renders while this one is sent
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()  # set on barge-in, when FastRTC closes this generator
+    tts_task = _track(asyncio.to_thread(_produce, tts_model.stream_tts_sync(response), queue, loop, stop))
+    try:
+        while (pcm := await queue.get()) is not _DONE:
+            yield pcm
+    finally:
+        stop.set()
+    await tts_task  # surface synthesis errors
 
 # 5) Launch FastRTC’s Gradio UI
 stream = Stream(
-    handler=ReplyOnPause(handle_audio, input_sample_rate=16000, can_interrupt=True),
+    handler=ReplyOnPause(
+        handle_audio,
+        # A pause is judged once per audio chunk, so shorter chunks hand the
+        # utterance to STT sooner after the user stops talking (default 0.6 s).
+        algo_options=AlgoOptions(audio_chunk_duration=0.4, started_talking_threshold=0.2, speech_threshold=0.1),
+        model_options=SileroVadOptions(threshold=0.5, min_speech_duration_ms=250, min_silence_duration_ms=500),
+        input_sample_rate=16000,
+        can_interrupt=True,
+    ),
     modality="audio",
     mode="send-receive",
 
 )
 
+
+def _warmup():
+    """Pay model load / connection cold-start before the first real utterance."""
+    print("Warming up STT, TTS and agent...")
+    try:
+        stt_model.stt((16000, np.zeros(1600, dtype=np.int16)))  # 0.1 s of silence
+    except Exception as err:
+        print(f"[warn] STT warmup failed: {err}")
+    try:
+        next(iter(tts_model.stream_tts_sync("ok")), None)
+    except Exception as err:
+        print(f"[warn] TTS warmup failed: {err}")
+    try:
+        agent.run("ping", reset=True, max_steps=1)
+        agent.memory.reset()  # keep the warmup turn out of the conversation
+    except Exception as err:
+        print(f"[warn] Agent warmup failed: {err}")
+
+
 if __name__ == "__main__":
+    _warmup()
     stream.ui.launch(server_port=7860)
@@ -0,0 +1,43 @@
+"""Process-wide model and agent construction shared by every entry point."""
+import os
+from functools import lru_cache
+
+import httpx
+from smolagents import CodeAgent, OpenAIServerModel
+
+# Any OpenAI-compatible server works; point these at vLLM for continuous batching
+DEFAULT_MODEL_ID = os.environ.get("SMOL_DAEMON_MODEL_ID", "deepseek-r1-0528-qwen3-8b")  # matches the model name in LM Studio
+_LM_STUDIO_API_BASE = "http://localhost:1234/v1"  # LM Studio’s endpoint
+API_BASE = os.environ.get("SMOL_DAEMON_API_BASE", _LM_STUDIO_API_BASE)
+# llama.cpp's cache_prompt is not an OpenAI parameter and strict servers reject it,
+# so it is only sent to LM Studio unless SMOL_DAEMON_CACHE_PROMPT says otherwise.
+CACHE_PROMPT = os.environ.get("SMOL_DAEMON_CACHE_PROMPT",
+                              "1" if API_BASE == _LM_STUDIO_API_BASE else "0") == "1"
+
+
+@lru_cache(maxsize=None)
+def get_http_client() -> httpx.Client:
+    """Return the keep-alive pool shared by every model in this process."""
+    # The default 5 s expiry drops the connection between spoken turns,
+    # so every agent step would reconnect.
+    return httpx.Client(limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60))
+
+
+@lru_cache(maxsize=None)
+def get_model(model_id: str = DEFAULT_MODEL_ID) -> OpenAIServerModel:
+    """Return the model for *model_id*, constructing it once per process."""
+    # llama.cpp-based servers (LM Studio) reuse the KV cache for the shared
+    # system-prompt prefix; vLLM does the same with --enable-prefix-caching.
+    extra = {"extra_body": {"cache_prompt": True}} if CACHE_PROMPT else {}
+    return OpenAIServerModel(
+        model_id=model_id,
+        api_base=API_BASE,
+        api_key="none",
+        client_kwargs={"http_client": get_http_client()},
+        **extra,
+    )
+
+
+def get_agent(*, tools, **kwargs) -> CodeAgent:
+    """Build a CodeAgent with *tools* on top of the shared model."""
+    return CodeAgent(tools=tools, model=get_model(), **kwargs)
@@ -1,7 +1,17 @@
+import os
+import selectors
+import shutil
 import subprocess
+import time
+from collections import deque
 
 from smolagents import tool
 
+# Resolved once at import; clean_system only re-walks PATH if it was missing
+_BLEACHBIT_PATH = shutil.which("bleachbit")
+
+_TIMEOUT = 300  # seconds
+
 
 @tool
 def clean_system(preview: bool = False) -> str:
@@ -15,26 +25,40 @@ def clean_system(preview: bool = False) -> str:
     Returns:
         str: Summary of cleanup results or preview of what would be cleaned.
     """
+    global _BLEACHBIT_PATH
+
     action = "preview" if preview else "clean"
     print(f"Running BleachBit {action}...")
 
     try:
         # Check if BleachBit is available
-        check_result = subprocess.run(["which", "bleachbit"], capture_output=True, text=True)
-        if check_result.returncode != 0:
+        if _BLEACHBIT_PATH is None:
+            _BLEACHBIT_PATH = shutil.which("bleachbit")
+        if _BLEACHBIT_PATH is None:
             raise FileNotFoundError("BleachBit not found. Install with: sudo apt install bleachbit")
 
         # Run preview or actual cleanup
-        cmd = ["bleachbit", "--preview", "--preset"] if preview else ["bleachbit", "--clean", "--preset"]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        cmd = [_BLEACHBIT_PATH, "--preview", "--preset"] if preview else [_BLEACHBIT_PATH, "--clean", "--preset"]
+
+        # Stream output and keep only the last 3 lines so memory stays flat on long runs
+        tail = deque(maxlen=3)
+        deadline = time.monotonic() + _TIMEOUT
+        with subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, close_fds=False) as proc:  # posix_spawn-eligible
+            try:
+                _read_tail(proc.stdout.fileno(), tail, deadline)
+                returncode = proc.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+                raise subprocess.TimeoutExpired(cmd, _TIMEOUT) from None
 
-        print(f"BleachBit finished with exit code: {result.returncode}")
+        print(f"BleachBit finished with exit code: {returncode}")
 
-        output_lines = (result.stdout or result.stderr or f"BleachBit {action} completed (no detailed output)").strip().splitlines()
-        output_tail = "\n".join(output_lines[-3:])  # Last 10 lines
+        output_tail = "\n".join(tail) or f"BleachBit {action} completed (no detailed output)"
 
-        if result.returncode != 0:
-            print(f"Warning: exit code {result.returncode}")
+        if returncode != 0:
+            print(f"Warning: exit code {returncode}")
             return f"BleachBit {action} completed with warnings:\n{output_tail}"
 
         return f"BleachBit {action} successful:\n{output_tail}"
@@ -47,3 +71,25 @@ def clean_system(preview: bool = False) -> str:
         error_msg = f"BleachBit {action} failed: {str(e)}"
         print(error_msg)
         raise
+
+
+def _read_tail(fd: int, tail: deque, deadline: float) -> None:
+    """Append non-blank output lines from *fd* to *tail* until EOF or *deadline*.
+
+    Reading against the deadline, rather than iterating the pipe, returns on time
+    even while a helper BleachBit spawned still holds the write end open.
+    """
+    pending = b""
+    with selectors.DefaultSelector() as sel:
+        sel.register(fd, selectors.EVENT_READ)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not sel.select(remaining):
+                raise subprocess.TimeoutExpired("bleachbit", _TIMEOUT)
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            *lines, pending = (pending + chunk).split(b"\n")
+            tail.extend(ln.decode(errors="replace").rstrip() for ln in lines if ln.strip())
+    if pending.strip():
+        tail.append(pending.decode(errors="replace").rstrip())
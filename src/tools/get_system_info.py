@@ -1,5 +1,11 @@
-import subprocess
+import heapq
+import math
+import os
 import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import time
 from smolagents import tool
 
 # Optional: Use psutil if available for better process info
@@ -10,6 +16,40 @@ try:
 except ImportError:
     HAS_PSUTIL = False
 
+# Optional: Use NVML bindings (nvidia-ml-py) to read GPU memory without spawning nvidia-smi
+try:
+    import pynvml
+
+    pynvml.nvmlInit()
+    HAS_NVML = True
+except Exception:  # ImportError, or NVMLError when no NVIDIA driver is loaded
+    HAS_NVML = False
+
+# System state barely changes within a few seconds, so repeated calls within
+# one agent turn reuse the last report instead of re-spawning every probe.
+_TTL = 3.0
+_CACHE = {"ts": 0.0, "value": None}
+_CACHE_LOCK = threading.Lock()
+
+# Probes overlap on a persistent pool so wall time is the slowest probe, not the sum
+_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sysinfo")
+_PROBE_TIMEOUT = 12  # seconds; above nvidia-smi's own 10 s limit
+
+# Seconds between the two cpu_percent() reads when sampling processes with psutil
+_CPU_SAMPLE_INTERVAL = 0.1
+
+# /proc/meminfo fields needed for the RAM report
+_MEMINFO_KEYS = {b'MemTotal', b'MemAvailable'}
+
+# Same exclusions the old `df --exclude-type` call used
+_EXCLUDED_FS_TYPES = {'tmpfs', 'devtmpfs'}
+
+# Shared by the psutil and /proc process tables
+_PROCESS_HEADER = "PID     NAME                CPU%    MEM%\n"
+
+_CLK_TCK = os.sysconf('SC_CLK_TCK')
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
 
 @tool
 def get_system_info() -> str:
@@ -20,67 +60,102 @@ def get_system_info() -> str:
 
     Returns:
         str: Formatted system information including:
-             - Disk storage usage (df)
+             - Disk storage usage
              - RAM usage
              - GPU memory (if available)
              - Top 5 processes by resource usage
     """
-    print("Gathering system information...")
+    if time.monotonic() - _CACHE["ts"] < _TTL:
+        print("Returning cached system information")
+        return _CACHE["value"]
 
-    info_sections = []
+    # Single-flight: concurrent callers wait for one refresh instead of each spawning probes
+    with _CACHE_LOCK:
+        if time.monotonic() - _CACHE["ts"] < _TTL:
+            print("Returning cached system information")
+            return _CACHE["value"]
 
-    # Get storage info
-    print("Checking disk storage...")
-    storage_info = _get_storage_info()
-    info_sections.append(f"💾 DISK STORAGE:\n{storage_info}")
+        result = _collect_system_info()
+        _CACHE["value"] = result
+        _CACHE["ts"] = time.monotonic()
+        return result
 
-    # Get RAM info
-    print("Checking RAM usage...")
-    ram_info = _get_ram_info()
-    info_sections.append(f"🧠 RAM USAGE:\n{ram_info}")
 
-    # Get GPU info
-    print("Checking GPU memory...")
-    gpu_info = _get_gpu_info()
-    if gpu_info:
-        info_sections.append(f"🎮 GPU MEMORY:\n{gpu_info}")
+def _collect_system_info() -> str:
+    """Run every probe and assemble the formatted report."""
+    print("Gathering system information...")
 
-    # Get top processes
-    print("Getting top processes...")
-    process_info = _get_top_processes()
-    info_sections.append(f"⚡ TOP 5 PROCESSES:\n{process_info}")
+    print("Checking disk storage, RAM, GPU memory and top processes...")
+    futures = {name: _POOL.submit(fn) for name, fn in (("storage", _get_storage_info),
+                                                       ("ram", _get_ram_info),
+                                                       ("gpu", _get_gpu_info),
+                                                       ("procs", _get_top_processes))}
+    res = {name: _probe_result(name, future) for name, future in futures.items()}
+
+    info_sections = [
+        f"💾 DISK STORAGE:\n{res['storage']}",
+        f"🧠 RAM USAGE:\n{res['ram']}",
+    ]
+    if res["gpu"]:
+        info_sections.append(f"🎮 GPU MEMORY:\n{res['gpu']}")
+    info_sections.append(f"⚡ TOP 5 PROCESSES:\n{res['procs']}")
 
     result = "\n\n".join(info_sections)
     print("System information gathered successfully")
     return result
 
 
+def _probe_result(name: str, future) -> str:
+    """Wait for one probe, turning a hung or failed probe into a message so other sections survive."""
+    try:
+        return future.result(timeout=_PROBE_TIMEOUT)
+    except TimeoutError:
+        error_msg = f"{name} check timed out after {_PROBE_TIMEOUT} seconds"
+        print(error_msg)
+        return error_msg
+    except Exception as e:
+        error_msg = f"Failed to get {name} info: {e}"
+        print(error_msg)
+        return error_msg
+
+
 def _get_storage_info() -> str:
-    """Get disk storage using df command."""
+    """Get disk storage from /proc/mounts and statvfs, formatted like df -h."""
     try:
-        # Use df -h for human readable format
-        result = subprocess.run(['df', '-h', '--exclude-type=tmpfs', '--exclude-type=devtmpfs'],
-                                capture_output=True, text=True, timeout=10)
-
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 1:
-                # Format the output nicely
-                header = lines[0]
-                data_lines = lines[1:]
-
-                formatted = f"{header}\n"
-                for line in data_lines:
-                    formatted += f"{line}\n"
-
-                print(f"Found {len(data_lines)} storage devices")
-                return formatted.strip()
-            else:
-                print("No storage info in df output")
-                return "No storage information available"
-        else:
-            print(f"df command failed: {result.stderr}")
-            return f"Storage check failed: {result.stderr}"
+        rows = []
+        seen = set()
+        with open('/proc/mounts') as f:
+            for line in f:
+                device, mount_point, fs_type = line.split()[:3]
+                if fs_type in _EXCLUDED_FS_TYPES or device in seen:
+                    continue
+                mount_point = _unescape_mount(mount_point)
+                try:
+                    st = os.statvfs(mount_point)
+                except OSError:
+                    continue
+                if st.f_blocks == 0:  # pseudo filesystems (proc, sysfs, cgroup, ...)
+                    continue
+                seen.add(device)
+
+                size = st.f_blocks * st.f_frsize
+                used = (st.f_blocks - st.f_bfree) * st.f_frsize
+                avail = st.f_bavail * st.f_frsize
+                use_percent = -(-used * 100 // (used + avail)) if used + avail else 0  # df rounds up
+                rows.append((device, _human_size(size), _human_size(used), _human_size(avail),
+                             f"{use_percent}%", mount_point))
+
+        if not rows:
+            print("No storage info in /proc/mounts")
+            return "No storage information available"
+
+        width = max(len("Filesystem"), *(len(row[0]) for row in rows))
+        formatted = f"{'Filesystem':<{width}} {'Size':>5} {'Used':>5} {'Avail':>5} {'Use%':>4} Mounted on"
+        for device, size, used, avail, use_percent, mount_point in rows:
+            formatted += f"\n{device:<{width}} {size:>5} {used:>5} {avail:>5} {use_percent:>4} {mount_point}"
+
+        print(f"Found {len(rows)} storage devices")
+        return formatted
 
     except Exception as e:
         error_msg = f"Failed to get storage info: {e}"
@@ -88,24 +163,47 @@ def _get_storage_info() -> str:
         return error_msg
 
 
+def _unescape_mount(field: str) -> str:
+    """Decode the octal escapes (\\040 for space, ...) used in /proc/mounts."""
+    if '\\' not in field:
+        return field
+    return field.replace('\\040', ' ').replace('\\011', '\t').replace('\\012', '\n').replace('\\134', '\\')
+
+
+def _human_size(num_bytes: int) -> str:
+    """Format bytes the way df -h does (1024-based, rounded up, one decimal below 10)."""
+    size = float(num_bytes)
+    for unit in ('', 'K', 'M', 'G', 'T', 'P'):
+        if size < 1024 or unit == 'P':
+            break
+        size /= 1024
+    if unit == '':
+        return f"{int(size)}"
+    if size < 10:
+        return f"{math.ceil(size * 10) / 10:.1f}{unit}"
+    return f"{math.ceil(size)}{unit}"
+
+
+def _read_meminfo() -> dict[bytes, int]:
+    """Return the _MEMINFO_KEYS fields of /proc/meminfo in bytes."""
+    # MemTotal and MemAvailable are the first entries, so stop as soon as both are read
+    found = {}
+    with open('/proc/meminfo', 'rb') as f:
+        for line in f:
+            key, _, rest = line.partition(b':')
+            if key in _MEMINFO_KEYS:
+                found[key] = int(rest.split()[0]) * 1024  # Convert KB to bytes
+                if len(found) == len(_MEMINFO_KEYS):
+                    break
+    return found
+
+
 def _get_ram_info() -> str:
     """Get RAM usage from /proc/meminfo."""
     try:
-        with open('/proc/meminfo', 'r') as f:
-            meminfo = f.read()
-
-        # Extract key memory values
-        mem_total = None
-        mem_available = None
-        mem_free = None
-
-        for line in meminfo.split('\n'):
-            if line.startswith('MemTotal:'):
-                mem_total = int(line.split()[1]) * 1024  # Convert KB to bytes
-            elif line.startswith('MemAvailable:'):
-                mem_available = int(line.split()[1]) * 1024
-            elif line.startswith('MemFree:'):
-                mem_free = int(line.split()[1]) * 1024
+        found = _read_meminfo()
+        mem_total = found.get(b'MemTotal')
+        mem_available = found.get(b'MemAvailable')
 
         if mem_total and mem_available:
             mem_used = mem_total - mem_available
@@ -131,13 +229,32 @@ def _get_ram_info() -> str:
 
 
 def _get_gpu_info() -> str:
-    """Get GPU memory info using nvidia-smi if available."""
-    # Check for NVIDIA GPU
-    if shutil.which('nvidia-smi'):
+    """Get GPU memory info using NVML or nvidia-smi if available."""
+    # Check for NVIDIA GPU, in-process first
+    if HAS_NVML:
         try:
-            result = subprocess.run(['nvidia-smi', '--query-gpu=memory.total,memory.used,memory.free',
+            gpu_info = []
+            for i in range(pynvml.nvmlDeviceGetCount()):
+                mem = pynvml.nvmlDeviceGetMemoryInfo(pynvml.nvmlDeviceGetHandleByIndex(i))
+                total = mem.total // (1024 ** 2)
+                used = mem.used // (1024 ** 2)
+                usage_percent = (used / total) * 100
+                gpu_info.append(f"GPU {i}: {used}MB/{total}MB used ({usage_percent:.1f}%)")
+
+            if gpu_info:
+                print(f"Found {len(gpu_info)} NVIDIA GPU(s)")
+                return '\n'.join(gpu_info)
+
+        except Exception as e:
+            print(f"NVML query failed: {e}")
+
+    nvidia_smi = shutil.which('nvidia-smi')
+    if nvidia_smi:
+        try:
+            # posix_spawn-eligible
+            result = subprocess.run([nvidia_smi, '--query-gpu=memory.total,memory.used,memory.free',
                                      '--format=csv,noheader,nounits'],
-                                    capture_output=True, text=True, timeout=10)
+                                    capture_output=True, text=True, timeout=10, close_fds=False)
 
             if result.returncode == 0:
                 lines = result.stdout.strip().split('\n')
@@ -172,73 +289,134 @@ def _get_top_processes() -> str:
     if HAS_PSUTIL:
         return _get_processes_psutil()
     else:
-        return _get_processes_ps()
+        return _get_processes_procfs()
 
 
 def _get_processes_psutil() -> str:
     """Get processes using psutil (preferred)."""
     try:
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        # cpu_percent() returns 0.0 on its first call, so prime every process,
+        # wait a short sampling interval, then read the real values.
+        procs = []
+        for proc in psutil.process_iter(['pid', 'name']):
             try:
-                proc_info = proc.info
-                if proc_info['cpu_percent'] > 0 or proc_info['memory_percent'] > 0:
-                    processes.append({
-                        'pid': proc_info['pid'],
-                        'name': proc_info['name'],
-                        'cpu': proc_info['cpu_percent'],
-                        'memory': proc_info['memory_percent']
-                    })
+                proc.cpu_percent(None)
+                procs.append(proc)
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
 
-        # Sort by CPU usage, then memory
-        processes.sort(key=lambda x: (x['cpu'] + x['memory']), reverse=True)
+        time.sleep(_CPU_SAMPLE_INTERVAL)
 
-        result = "PID     NAME                CPU%    MEM%\n"
-        for proc in processes[:5]:
-            result += f"{proc['pid']:<8} {proc['name'][:15]:<15} {proc['cpu']:<7.1f} {proc['memory']:<7.1f}\n"
+        # Fixed-size min-heap keeps only the current top 5 by CPU + memory
+        top = []
+        active = 0
+        for proc in procs:
+            try:
+                cpu = proc.cpu_percent(None)
+                memory = proc.memory_percent()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            if cpu <= 0 and memory <= 0:
+                continue
+
+            active += 1
+            score = cpu + memory
+            if len(top) < 5:
+                heapq.heappush(top, (score, proc.pid, proc.info['name'] or '', cpu, memory))
+            elif score > top[0][0]:
+                heapq.heapreplace(top, (score, proc.pid, proc.info['name'] or '', cpu, memory))
+
+        result = _PROCESS_HEADER
+        for _, pid, name, cpu, memory in sorted(top, reverse=True):
+            result += f"{pid:<8} {name[:15]:<15} {cpu:<7.1f} {memory:<7.1f}\n"
 
-        print(f"Found {len(processes)} active processes")
+        print(f"Found {active} active processes")
         return result.strip()
 
     except Exception as e:
         print(f"psutil process check failed: {e}")
-        return _get_processes_ps()
+        return _get_processes_procfs()
 
 
-def _get_processes_ps() -> str:
-    """Get processes using ps command (fallback)."""
+def _get_processes_procfs() -> str:
+    """Get processes by sampling /proc/[pid]/stat (fallback)."""
     try:
-        # Get processes sorted by CPU usage
-        result = subprocess.run(['ps', 'aux', '--sort=-pcpu'],
-                                capture_output=True, text=True, timeout=10)
-
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 1:
-                header = "PID     NAME                CPU%    MEM%"
-                process_lines = []
-
-                for line in lines[1:6]:  # Skip header, get top 5
-                    parts = line.split()
-                    if len(parts) >= 11:
-                        pid = parts[1]
-                        cpu = parts[2]
-                        mem = parts[3]
-                        name = parts[10]
-                        process_lines.append(f"{pid:<8} {name[:15]:<15} {cpu:<7} {mem:<7}")
-
-                print(f"Got top 5 processes via ps command")
-                return header + "\n" + "\n".join(process_lines)
-            else:
-                print("No process data from ps")
-                return "No process information available"
-        else:
-            print(f"ps command failed: {result.stderr}")
-            return f"Process check failed: {result.stderr}"
+        # CPU% needs two samples of utime+stime taken a short interval apart
+        first, first_at = _timed_cpu_sample()
+        time.sleep(_CPU_SAMPLE_INTERVAL)
+        second, second_at = _timed_cpu_sample()
+
+        mem_total = _read_meminfo().get(b'MemTotal')
+        # Measured, not nominal: a /proc sweep over many PIDs adds to the sleep
+        elapsed_ticks = _CLK_TCK * (second_at - first_at)
+
+        # Fixed-size min-heap keeps only the current top 5 by CPU + memory
+        top = []
+        active = 0
+        for pid, (name, ticks) in second.items():
+            cpu = (ticks - first[pid][1]) / elapsed_ticks * 100 if pid in first else 0.0
+            memory = _read_rss(pid) / mem_total * 100 if mem_total else 0.0
+            if cpu <= 0 and memory <= 0:
+                continue
+
+            active += 1
+            score = cpu + memory
+            if len(top) < 5:
+                heapq.heappush(top, (score, pid, name, cpu, memory))
+            elif score > top[0][0]:
+                heapq.heapreplace(top, (score, pid, name, cpu, memory))
+
+        if not top:
+            print("No process data in /proc")
+            return "No process information available"
+
+        result = _PROCESS_HEADER
+        for _, pid, name, cpu, memory in sorted(top, reverse=True):
+            result += f"{pid:<8} {name[:15]:<15} {cpu:<7.1f} {memory:<7.1f}\n"
+
+        print(f"Found {active} active processes")
+        return result.strip()
 
     except Exception as e:
         error_msg = f"Failed to get process info: {e}"
         print(error_msg)
-        return error_msg
\ No newline at end of file
+        return error_msg
+
+
+def _timed_cpu_sample() -> tuple[dict[int, tuple[str, int]], float]:
+    """Return _sample_cpu_ticks() and the monotonic midpoint of the sweep."""
+    start = time.monotonic()
+    samples = _sample_cpu_ticks()
+    return samples, (start + time.monotonic()) / 2
+
+
+def _sample_cpu_ticks() -> dict[int, tuple[str, int]]:
+    """Return {pid: (name, utime + stime)} for every process in /proc."""
+    samples = {}
+    with os.scandir('/proc') as it:
+        pids = [entry.name for entry in it
+                if entry.name.isdigit() and entry.is_dir(follow_symlinks=False)]  # d_type, no stat
+
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:  # process exited or is not readable
+            continue
+        # The name is wrapped in parentheses and may itself contain spaces or ')'
+        name_start = stat.find(b'(')
+        name_end = stat.rfind(b')')
+        fields = stat[name_end + 2:].split()
+        # utime and stime are fields 14 and 15; fields[0] is field 3 (state)
+        samples[int(pid)] = (stat[name_start + 1:name_end].decode(errors='replace'),
+                               int(fields[11]) + int(fields[12]))
+    return samples
+
+
+def _read_rss(pid: int) -> int:
+    """Return the resident set size of *pid* in bytes, or 0 if it is gone."""
+    try:
+        with open(f'/proc/{pid}/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
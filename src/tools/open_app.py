@@ -1,63 +1,178 @@
 from pathlib import Path
+import functools
+import heapq
+import os
 import subprocess
 import shutil
-import difflib
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from smolagents import tool
 
 # Import fuzzy search package
 try:
-    from thefuzz import process
+    from rapidfuzz import fuzz, process, utils
     HAS_FUZZY = True
 except ImportError:
     HAS_FUZZY = False
-    print("Warning: thefuzz package not installed. Fuzzy search disabled.")
+    print("Warning: rapidfuzz package not installed. Fuzzy search disabled.")
 
 # --------------------------------------------------------------------------- #
 # Helpers to collect application metadata                                     #
 # --------------------------------------------------------------------------- #
 
+# Launcher binaries, resolved once at import
+_GTK_LAUNCH = shutil.which("gtk-launch")
+_FLATPAK = shutil.which("flatpak")
+_SNAP = shutil.which("snap")
+_XDG_OPEN = shutil.which("xdg-open")
+
 _DESKTOP_DIRS = [
     Path("/usr/share/applications"),
     Path("/usr/local/share/applications"),
     Path.home() / ".local/share/applications",
 ]
 
-def _collect_desktop_entries() -> dict[str, str]:
-    """Return {launcher: human-readable name} from .desktop files."""
-    out = {}
+# Installed Flatpak apps live here; if both are empty there is nothing to list
+_FLATPAK_APP_DIRS = [
+    Path("/var/lib/flatpak/app"),
+    Path.home() / ".local/share/flatpak/app",
+]
+
+# Seconds a flatpak / snap listing stays valid (the _catalog time bucket)
+_APP_LIST_TTL = 30
+
+# (entries, fuzzy-normalized launch names) keyed by _catalog_signature(); holds at most one entry
+_CATALOG_CACHE: dict[tuple, tuple[dict[str, str], dict[str, str]]] = {}
+
+
+def _catalog_signature() -> tuple:
+    """Return (dir, dir mtime, newest entry mtime, file count) per desktop dir.
+
+    The dir's own mtime catches adds, removes and renames even when a package
+    manager preserves file mtimes; entry mtimes catch in-place edits.
+    """
+    sig = []
     for folder in _DESKTOP_DIRS:
-        if not folder.exists():
+        try:
+            dir_mtime = os.stat(folder).st_mtime_ns
+            with os.scandir(folder) as it:
+                entries = [e for e in it if e.name.endswith(".desktop")]
+        except OSError:
             continue
-        for f in folder.glob("*.desktop"):
-            try:
-                text = f.read_text("utf-8", errors="ignore")
-            except Exception:
-                continue
-            if any(tag in text for tag in ("NoDisplay=true", "Hidden=true")):
-                continue
-            for line in text.splitlines():
-                if line.startswith("Name="):
-                    out[f.stem] = line.partition("=")[2].strip()
-                    break
-    return out
+        mtimes = [_entry_mtime(e) for e in entries]
+        sig.append((str(folder), dir_mtime, max(mtimes, default=0), len(mtimes)))
+    return tuple(sig)
+
+
+def _entry_mtime(entry: os.DirEntry) -> int:
+    """Return *entry*'s own mtime (lstat), or 0 if it vanished mid-scan."""
+    # Not following symlinks, so a dangling one can't knock its dir out of the signature
+    try:
+        return entry.stat(follow_symlinks=False).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _collect_desktop_entries() -> dict[str, str]:
+    """Return {launcher: human-readable name} from .desktop files, cached until they change."""
+    return _desktop_catalog()[0]
+
+
+def _desktop_catalog(sig: tuple | None = None) -> tuple[dict[str, str], dict[str, str]]:
+    """Return the cached desktop entries plus {launcher: normalized launcher} for fuzzy scoring.
+
+    Pass *sig* when the caller already has _catalog_signature(), to skip another stat sweep.
+    """
+    if sig is None:
+        sig = _catalog_signature()
+    catalog = _CATALOG_CACHE.get(sig)
+    if catalog is None:
+        # Later dirs (e.g. ~/.local) come last, so their entries override system ones
+        entries = dict(_iter_desktop_entries())
+        # Normalize once per scan rather than once per candidate per query
+        processed = {k: utils.default_process(k) for k in entries} if HAS_FUZZY else {}
+        _CATALOG_CACHE.clear()
+        catalog = _CATALOG_CACHE[sig] = (entries, processed)
+    return catalog
+
+
+def _iter_desktop_entries() -> Iterator[tuple[str, str]]:
+    """Yield (launcher, name) for every visible .desktop file in _DESKTOP_DIRS, in dir order."""
+    print("Scanning for applications...")
+    paths = [p for d in _DESKTOP_DIRS if d.exists() for p in d.glob("*.desktop")]
+
+    # Reads release the GIL, so a pool overlaps page-cache misses; not worth it for a few files
+    if len(paths) > 16:
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as ex:
+            results = list(ex.map(_parse_one, paths))
+    else:
+        results = map(_parse_one, paths)
+
+    yield from (r for r in results if r is not None)
+
+
+def _parse_one(path: Path) -> tuple[str, str] | None:
+    """Return (launcher, name) for one .desktop file, or None to skip it."""
+    try:
+        name = _parse_desktop_file(path)
+    except Exception:
+        return None
+    return (path.stem, name) if name is not None else None
+
+
+def _parse_desktop_file(path: Path) -> str | None:
+    """Return the Name= of a visible .desktop file, or None if hidden or unnamed."""
+    data = path.read_bytes()
+
+    # Only the [Desktop Entry] group counts; [Desktop Action ...] groups follow it
+    start = max(data.find(b"[Desktop Entry]"), 0)
+    end = data.find(b"\n[", start + 1)
+    if end == -1:
+        end = len(data)
+
+    if data.find(b"NoDisplay=true", start, end) != -1 or data.find(b"Hidden=true", start, end) != -1:
+        return None
+
+    if data.startswith(b"Name=", start):
+        idx = start
+    else:
+        idx = data.find(b"\nName=", start, end)
+        if idx == -1:
+            return None
+        idx += 1
+    line_end = data.find(b"\n", idx, end)
+    if line_end == -1:
+        line_end = end
+    return data[idx + 5:line_end].decode("utf-8", "ignore").strip()
+
+
+def _has_entries(path) -> bool:
+    """Return True if *path* is a directory with at least one entry."""
+    try:
+        with os.scandir(path) as it:
+            return next(it, None) is not None
+    except OSError:
+        return False
 
 
 def _collect_flatpak_apps() -> dict[str, str]:
     """Return {app_id: display_name} for installed Flatpaks."""
-    if shutil.which("flatpak") is None:
+    if _FLATPAK is None or not any(_has_entries(d) for d in _FLATPAK_APP_DIRS):
         return {}
     try:
         res = subprocess.run(
-            ["flatpak", "list", "--app", "--columns=application,name"],
+            [_FLATPAK, "list", "--app", "--columns=application,name"],
             capture_output=True,
             text=True,
             timeout=5,
         )
         apps = {}
         for line in res.stdout.strip().splitlines():
-            parts = [p.strip() for p in line.split("\t") if p.strip()]
-            if len(parts) >= 2:
-                apps[parts[0]] = parts[1]
+            parts = line.split("\t", 1)  # only application and name columns
+            if len(parts) == 2 and parts[0].strip() and parts[1].strip():
+                apps[parts[0].strip()] = parts[1].strip()
         return apps
     except Exception as err:
         print(f"[warn] flatpak list failed: {err}")
@@ -66,11 +181,11 @@ def _collect_flatpak_apps() -> dict[str, str]:
 
 def _collect_snap_apps() -> dict[str, str]:
     """Return {snap_name: snap_name}. We use the name twice for lack of summary."""
-    if shutil.which("snap") is None:
+    if _SNAP is None or not os.path.isdir("/snap"):
         return {}
     try:
         res = subprocess.run(
-            ["snap", "list", "--color=never"],
+            [_SNAP, "list", "--color=never"],
             capture_output=True,
             text=True,
             timeout=5,
@@ -82,123 +197,118 @@ def _collect_snap_apps() -> dict[str, str]:
         return {}
 
 
+@functools.lru_cache(maxsize=1)
+def _catalog(desktop_sig: tuple, ttl_bucket: int) -> tuple[dict[str, str], dict[str, str]]:
+    """Return ({launcher: display name}, {launcher: kind}) across desktop, Flatpak and Snap.
+
+    Keyed on the desktop signature plus a _APP_LIST_TTL time bucket, so warm calls
+    return the merged dicts as-is until a desktop file or the listing TTL changes.
+    The bucket is the only TTL: flatpak and snap are listed once per bucket.
+    """
+    desktop = _desktop_catalog(desktop_sig)[0]
+    flatpaks = _collect_flatpak_apps()
+    snaps = _collect_snap_apps()
+    entries = {**flatpaks, **snaps, **desktop}  # desktop wins duplicates
+    # ...but the launcher is picked flatpak first, then snap, then desktop
+    kinds = {**dict.fromkeys(desktop, "desktop"), **dict.fromkeys(snaps, "snap"),
+             **dict.fromkeys(flatpaks, "flatpak")}
+    return entries, kinds
+
+
+def _current_catalog(sig: tuple | None = None) -> tuple[dict[str, str], dict[str, str]]:
+    """Return the merged catalog for desktop signature *sig* (computed if omitted) and the TTL bucket."""
+    if sig is None:
+        sig = _catalog_signature()
+    return _catalog(sig, int(time.monotonic() // _APP_LIST_TTL))
+
+
+def _invalidate_catalog() -> None:
+    """Drop every cached listing so the next call rescans (e.g. right after an install)."""
+    _catalog.cache_clear()
+    _CATALOG_CACHE.clear()
+
+
 # --------------------------------------------------------------------------- #
 # Launch strategy                                                             #
 # --------------------------------------------------------------------------- #
 
-def _try_launch(name: str) -> bool:
-    """Attempt to launch *name* using several strategies."""
-    # 1. direct executable or snap alias
-    if shutil.which(name):
-        try:
-            subprocess.Popen([name],
-                             stdout=subprocess.DEVNULL,
-                             stderr=subprocess.DEVNULL)
-            return True
-        except Exception as err:
-            print(f"[info] direct exec failed: {err}")
-
-    # 2. gtk-launch (desktop entry)
-    if shutil.which("gtk-launch"):
-        try:
-            if subprocess.run(["gtk-launch", name],
-                              stdout=subprocess.DEVNULL,
-                              stderr=subprocess.DEVNULL,
-                              timeout=5).returncode == 0:
-                return True
-        except Exception as err:
-            print(f"[info] gtk-launch failed: {err}")
-
-    # 3. flatpak run
-    if shutil.which("flatpak"):
-        try:
-            if subprocess.run(["flatpak", "run", name],
-                              stdout=subprocess.DEVNULL,
-                              stderr=subprocess.DEVNULL,
-                              timeout=5).returncode == 0:
-                return True
-        except Exception as err:
-            print(f"[info] flatpak run failed: {err}")
-
-    # 4. snap run
-    if shutil.which("snap"):
-        try:
-            if subprocess.run(["snap", "run", name],
-                              stdout=subprocess.DEVNULL,
-                              stderr=subprocess.DEVNULL,
-                              timeout=5).returncode == 0:
-                return True
-        except Exception as err:
-            print(f"[info] snap run failed: {err}")
-
-    # 5. xdg-open fallback
-    if shutil.which("xdg-open"):
-        try:
-            if subprocess.run(["xdg-open", name],
-                              stdout=subprocess.DEVNULL,
-                              stderr=subprocess.DEVNULL,
-                              timeout=5).returncode == 0:
-                return True
-        except Exception as err:
-            print(f"[info] xdg-open failed: {err}")
+def _launch_argv(name: str, kind: str) -> list[str] | None:
+    """Pick the one launcher for *name* given the catalog it came from."""
+    if kind == "flatpak" and _FLATPAK:
+        return [_FLATPAK, "run", name]
+    if kind == "snap" and _SNAP:
+        return [_SNAP, "run", name]
+    if kind == "desktop" and _GTK_LAUNCH:
+        return [_GTK_LAUNCH, name]
+    if kind != "xdg":
+        executable = shutil.which(name)  # direct executable or snap alias
+        if executable:
+            return [executable]
+    if _XDG_OPEN:
+        return [_XDG_OPEN, name]
+    return None
+
+
+def _try_launch(name: str, kind: str) -> bool:
+    """Launch *name* with the backend for *kind* ("exec", "desktop", "flatpak", "snap", "xdg")."""
+    argv = _launch_argv(name, kind)
+    if argv is None:
+        print(f"[info] no launcher available for {name} ({kind})")
+        return False
+
+    try:
+        _spawn_detached(argv)
+        return True
+    except Exception as err:
+        print(f"[info] {argv[0]} failed: {err}")
+        return False
+
 
-    return False
+# PIDs of launched apps; reaped without blocking so finished launchers don't linger as zombies
+_SPAWNED: set[int] = set()
 
+_DEVNULL_ACTIONS = [
+    (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+    (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+    (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+]
 
-def _fuzzy(name: str, choices) -> str | None:
-    """Return closest match for *name* among *choices*."""
-    match = difflib.get_close_matches(name, choices, n=1, cutoff=0.8)
-    return match[0] if match else None
 
+def _spawn_detached(argv: list[str]) -> int:
+    """Fire-and-forget *argv* (absolute path) in its own session via posix_spawn.
 
-def _list_apps(search_term: str = None) -> str:
+    posix_spawn uses vfork+exec, so the daemon's address space is never copied.
+    """
+    _reap_children()
+    pid = os.posix_spawn(argv[0], argv, os.environ, file_actions=_DEVNULL_ACTIONS, setsid=True)
+    _SPAWNED.add(pid)
+    return pid
+
+
+def _reap_children() -> None:
+    """Collect exit statuses of launched apps that have finished."""
+    for pid in list(_SPAWNED):
+        try:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            done = pid
+        if done:
+            _SPAWNED.discard(pid)
+
+
+def _list_apps(search_term: str = None, sig: tuple | None = None) -> str:
     """
     List available applications from desktop files.
 
     Args:
         search_term: Optional term to find similar app names using fuzzy search
+        sig: Desktop catalog signature the caller already computed, if any
 
     Returns:
         str: List of available applications or similar matches
     """
-    apps = []
-    app_dict = {}  # Dictionary to store launch_name -> display_name mapping
-    desktop_dirs = [
-        Path("/usr/share/applications"),
-        Path.home() / ".local/share/applications"
-    ]
-
-    print("Scanning for applications...")
-
-    for apps_dir in desktop_dirs:
-        if not apps_dir.exists():
-            continue
-
-        try:
-            for desktop_file in apps_dir.glob("*.desktop"):
-                try:
-                    with open(desktop_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-
-                    # Skip hidden applications
-                    if 'NoDisplay=true' in content or 'Hidden=true' in content:
-                        continue
-
-                    # Extract name
-                    for line in content.split('\n'):
-                        if line.startswith('Name=') and '=' in line:
-                            display_name = line.split('=', 1)[1].strip()
-                            launch_name = desktop_file.stem
-                            app_entry = f"{launch_name} ({display_name})"
-                            apps.append(app_entry)
-                            app_dict[launch_name] = display_name
-                            break
-
-                except Exception as e:
-                    print(f"Error reading {desktop_file.name}: {e}")
-
-        except Exception as e:
-            print(f"Error scanning {apps_dir}: {e}")
+    app_dict, processed = _desktop_catalog(sig)  # launch_name -> display_name / normalized name
+    apps = [f"{launch_name} ({display_name})" for launch_name, display_name in app_dict.items()]
 
     if not apps:
         return "No applications found. Try common names like 'firefox', 'code', 'nautilus'."
@@ -208,20 +318,20 @@ def _list_apps(search_term: str = None) -> str:
         print(f"Searching for apps similar to '{search_term}'...")
 
         # Search in launch names
-        matches = process.extract(search_term, app_dict.keys(), limit=5)
+        matches = process.extract(utils.default_process(search_term), processed, scorer=fuzz.WRatio,
+                                  processor=None, limit=5, score_cutoff=60)
 
         if matches:
             result = f"Similar applications to '{search_term}':\n"
-            for app_name, score in matches:
-                result += f"{app_name} ({app_dict[app_name]}) - {score}% match\n"
+            for _, score, app_name in matches:
+                result += f"{app_name} ({app_dict[app_name]}) - {score:.0f}% match\n"
             result += "\nUse one of these names with open_app() to launch"
             return result
         else:
             return f"No similar applications found for '{search_term}'. Try a different name."
 
     # Regular listing of apps (no search term)
-    apps.sort()
-    apps_list = apps[:15]  # Limit to avoid overwhelming output
+    apps_list = heapq.nsmallest(15, apps)  # Limit to avoid overwhelming output
     result = f"Available applications ({len(apps_list)} shown):\n" + "\n".join(apps_list)
 
     if len(apps) > 15:
@@ -230,68 +340,79 @@ def _list_apps(search_term: str = None) -> str:
     return result
 
 
-def _find_closest_app(search_term: str):
+# Shortest search term allowed to match by prefix/substring without fuzzy scoring
+_MIN_DIRECT_MATCH_LEN = 3
+
+
+def _find_closest_app(search_term: str, sig: tuple | None = None):
     """
     Find the closest matching app using fuzzy search.
 
     Args:
         search_term: Term to find similar app names
+        sig: Desktop catalog signature the caller already computed, if any
 
     Returns:
         tuple: (closest_app_name, score, display_name) or (None, 0, None) if no match found
     """
-    app_dict = {}  # Dictionary to store launch_name -> display_name mapping
-    desktop_dirs = [
-        Path("/usr/share/applications"),
-        Path.home() / ".local/share/applications"
-    ]
-
-    print("Scanning for applications...")
-
-    for apps_dir in desktop_dirs:
-        if not apps_dir.exists():
-            continue
-
-        try:
-            for desktop_file in apps_dir.glob("*.desktop"):
-                try:
-                    with open(desktop_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-
-                    # Skip hidden applications
-                    if 'NoDisplay=true' in content or 'Hidden=true' in content:
-                        continue
-
-                    # Extract name
-                    for line in content.split('\n'):
-                        if line.startswith('Name=') and '=' in line:
-                            display_name = line.split('=', 1)[1].strip()
-                            launch_name = desktop_file.stem
-                            app_dict[launch_name] = display_name
-                            break
-
-                except Exception as e:
-                    print(f"Error reading {desktop_file.name}: {e}")
-
-        except Exception as e:
-            print(f"Error scanning {apps_dir}: {e}")
+    app_dict, processed = _desktop_catalog(sig)  # launch_name -> display_name / normalized name
 
     if not app_dict:
         return None, 0, None
 
+    # Fast path: "firefox" -> "firefox-esr" needs no edit-distance scoring. Prefix hits
+    # beat substring hits, and very short terms are left to the scorer so a
+    # single letter cannot auto-launch whatever happens to contain it.
+    if len(search_term) >= _MIN_DIRECT_MATCH_LEN:
+        prefix, substring = [], []
+        for launch_name in app_dict:
+            lowered = launch_name.lower()
+            if lowered.startswith(search_term):
+                prefix.append(launch_name)
+            elif search_term in lowered:
+                substring.append(launch_name)
+        direct = prefix or substring
+        if direct:
+            closest_app = min(direct, key=len)
+            return closest_app, 100, app_dict[closest_app]
+
     if HAS_FUZZY:
         print(f"Searching for apps similar to '{search_term}'...")
 
         # Search in launch names
-        matches = process.extract(search_term, app_dict.keys(), limit=5)
+        match = process.extractOne(utils.default_process(search_term), processed, scorer=fuzz.WRatio,
+                                   processor=None, score_cutoff=60)
 
-        if matches and len(matches) > 0:
-            closest_app, score = matches[0]
+        if match:
+            _, score, closest_app = match
             return closest_app, score, app_dict[closest_app]
 
     return None, 0, None
 
 
+def _fuzzy_batch(queries: list[str]) -> list[tuple[str | None, int]]:
+    """
+    Score several search terms against the desktop catalog in one call.
+
+    Args:
+        queries: Search terms, e.g. the app names from one batch of requests
+
+    Returns:
+        list: (closest_app_name, score) per query, or (None, 0) where nothing scores >= 60
+    """
+    app_dict, processed = _desktop_catalog()
+    if not queries or not app_dict or not HAS_FUZZY:
+        return [(None, 0)] * len(queries)
+
+    names = list(processed)
+    # One C++ call for the whole query x catalog matrix; below-cutoff scores come back as 0
+    matrix = process.cdist([utils.default_process(q) for q in queries], list(processed.values()),
+                           scorer=fuzz.WRatio, processor=None, score_cutoff=60, dtype=np.uint8)
+    best = matrix.argmax(axis=1)
+    return [(names[j], int(matrix[i, j])) if matrix[i, j] else (None, 0)
+            for i, j in enumerate(best)]
+
+
 # --------------------------------------------------------------------------- #
 # The single-responsibility tool                                              #
 # --------------------------------------------------------------------------- #
@@ -308,14 +429,12 @@ def open_app(app_name: str | None = None) -> str:
     Returns:
         Success/failure notice or a list of installed applications.
     """
-    desktop = _collect_desktop_entries()
-    flatpaks = _collect_flatpak_apps()
-    snaps = _collect_snap_apps()
-    entries = {**flatpaks, **snaps, **desktop}  # desktop wins duplicates
+    sig = _catalog_signature()  # one stat sweep per call, shared by every lookup below
+    entries, kinds = _current_catalog(sig)
 
     # -------- catalog mode ---------------------------------------------------
     if not app_name:
-        sample = sorted(f"{k} ({v})" for k, v in entries.items())[:15]
+        sample = heapq.nsmallest(15, (f"{k} ({v})" for k, v in entries.items()))
         more = f"\n... and {len(entries)-15} more" if len(entries) > 15 else ""
         return "Available applications (15 shown):\n" + "\n".join(sample) + more
 
@@ -325,7 +444,7 @@ def open_app(app_name: str | None = None) -> str:
 
     # Try to launch the app directly first
     if key in entries:
-        if _try_launch(key):
+        if _try_launch(key, kinds.get(key, "exec")):
             print(f"Success: Launched {key} directly")
             return f"Successfully launched {key}"
         else:
@@ -336,12 +455,12 @@ def open_app(app_name: str | None = None) -> str:
     print(f"App '{key}' not found. Searching for similar names...")
 
     # Find the closest match
-    closest_app, score, display_name = _find_closest_app(key)
+    closest_app, score, display_name = _find_closest_app(key, sig)
 
     # If we found a good match (score >= 80), launch it automatically
     if closest_app and score >= 80:
-        print(f"Found close match: {closest_app} ({display_name}) - {score}% match. Launching automatically...")
-        if _try_launch(closest_app):
+        print(f"Found close match: {closest_app} ({display_name}) - {score:.0f}% match. Launching automatically...")
+        if _try_launch(closest_app, "desktop"):  # matches come from desktop entries
             print(f"Success: Launched {closest_app} automatically")
             return f"Successfully launched {closest_app} (matched from '{app_name}')"
         else:
@@ -350,6 +469,6 @@ def open_app(app_name: str | None = None) -> str:
 
     # Otherwise, show the list of similar apps
     if HAS_FUZZY:
-        return _list_apps(key)
+        return _list_apps(key, sig)
     else:
         return f"Application '{app_name}' not found. Run open_app() without arguments to see available apps."
@@ -1,8 +1,13 @@
 from smolagents import tool
 from pathlib import Path
 from collections import defaultdict
+import errno
+import logging
+import os
 import shutil
 
+log = logging.getLogger(__name__)
+
 
 @tool
 def organize_folder(folder_path: str) -> str:
@@ -30,34 +35,75 @@ def organize_folder(folder_path: str) -> str:
             raise NotADirectoryError(f"Not a directory: {path}")
 
         summary = defaultdict(int)
-        for item in path.iterdir():
-            if not item.is_file():
-                continue
-
-            ext = item.suffix.lstrip(".").lower() or "no_extension"
-            dest_dir = path / ext
-            dest_dir.mkdir(exist_ok=True)
-
-            target = dest_dir / item.name
-            if target.exists():
-                base, suffix = item.stem, item.suffix
-                count = 1
-                while target.exists():
-                    target = dest_dir / f"{base}_{count}{suffix}"
-                    count += 1
+        existing_names: dict[str, set[str]] = {}  # ext -> names already in that subfolder
+        # DirEntry answers is_file() from the directory listing, no per-file stat
+        with os.scandir(path) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+
+                # i > 0 keeps dotfiles like ".bashrc" extensionless
+                i = entry.name.rfind(".")
+                if i > 0:
+                    base, suffix = entry.name[:i], entry.name[i:]
+                    ext = suffix[1:].casefold() or "no_extension"
+                else:
+                    base, suffix = entry.name, ""
+                    ext = "no_extension"
+                dest_dir = path / ext
+
+                # First file of this extension: create the folder and list it, once
+                existing = existing_names.get(ext)
+                if existing is None:
+                    dest_dir.mkdir(exist_ok=True)
+                    existing = existing_names[ext] = set(os.listdir(dest_dir))
 
-            shutil.move(str(item), str(target))
-            summary[ext] += 1
-            print(f"Moved {item.name} to {ext}/ folder")
+                # The listing snapshot skips known names cheaply; _move itself refuses to
+                # replace, which also catches case-insensitive clashes (vfat/exFAT)
+                name, count = entry.name, 0
+                while True:
+                    if name not in existing:
+                        try:
+                            _move(entry.path, os.path.join(dest_dir, name))
+                            break
+                        except FileExistsError:
+                            pass
+                    existing.add(name)
+                    count += 1
+                    name = f"{base}_{count}{suffix}"
+                existing.add(name)
+                summary[ext] += 1
+                if log.isEnabledFor(logging.DEBUG):  # per-file; don't format or print in the hot loop
+                    log.debug("Moved %s to %s/ folder", entry.name, ext)
 
         if not summary:
             return f"No files to organize in {path}"
 
         result = f"Organized {sum(summary.values())} files in {path}:\n"
         result += "\n".join(f"{ext}: {count} files" for ext, count in sorted(summary.items()))
+        print(result)
         return result
 
     except Exception as e:
         error_msg = f"Failed to organize {folder_path}: {str(e)}"
         print(error_msg)
-        raise
\ No newline at end of file
+        raise
+
+
+def _move(src: str, dst: str) -> None:
+    """Move *src* to *dst*, raising FileExistsError rather than replacing an existing *dst*."""
+    try:
+        # link() fails with EEXIST instead of overwriting, making this an atomic no-replace rename
+        os.link(src, dst, follow_symlinks=False)
+    except FileExistsError:
+        raise
+    except OSError as e:
+        # No hard links here (vfat/exFAT) or across filesystems: check, then move
+        if os.path.lexists(dst):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst) from None
+        if e.errno == errno.EXDEV:
+            shutil.move(src, dst)
+        else:
+            os.rename(src, dst)
+        return
+    os.unlink(src)
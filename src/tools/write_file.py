@@ -1,10 +1,14 @@
+import os
 from pathlib import Path
 
 from smolagents import tool
 
+# Characters encoded and written per chunk; peak memory is the str plus one chunk
+_CHUNK_CHARS = 1 << 20
+
 
 @tool
-def write_file(file_path: str, content: str) -> str:
+def write_file(file_path: str, content: str, fsync: bool = False) -> str:
     """
     Writes content to a file at the specified path.
 
@@ -16,6 +20,7 @@ def write_file(file_path: str, content: str) -> str:
             - "output.txt" (current directory)
             Can use ~ for home directory.
         content: String content to write to the file.
+        fsync: If True, flush the file to disk before returning. Default is False.
 
     Returns:
         str: Confirmation message with file path and size written.
@@ -27,9 +32,13 @@ def write_file(file_path: str, content: str) -> str:
         # Create parent directories if they don't exist
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write the content
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Write the content, encoding in chunks instead of one full-size copy
+        with open(path, "wb") as f:
+            for start in range(0, len(content), _CHUNK_CHARS):
+                f.write(content[start:start + _CHUNK_CHARS].encode("utf-8"))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
 
         file_size = path.stat().st_size
         print(f"Successfully wrote {file_size} bytes to {path}")